@@ -0,0 +1,30 @@
+"""
+Optional Numba support.
+
+Exposes `njit` and `prange` from Numba when it is installed. Otherwise `njit` is a
+no-op decorator and `prange` is `range`, so the decorated functions still run as
+plain Python.
+"""
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    prange = range
+
+    def njit(*args, **kwargs):
+        """
+        Fallback for `numba.njit` that returns the function unchanged.
+
+        Supports both the bare `@njit` and the `@njit(...)` forms.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -2,35 +2,176 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import math
 
+import numpy as np
 
-def arr_mean(arr: list[float]) -> float:
+from _njit import njit
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+# Module level aliases, the hot paths below look these up as globals instead
+# of as attributes of the math module
+_sqrt = math.sqrt
+_exp = math.exp
+
+
+@njit(cache=True)
+def _arr_mean(arr):
+    """
+    Calculates the mean of a float64 array, compiled with Numba when it is available.
+    """
+    return arr.mean()
+
+
+@njit(cache=True)
+def _arr_std(arr):
+    """
+    Calculates the standard deviation of a float64 array with two passes, compiled with
+    Numba when it is available.
+    """
+    deviations = arr - arr.mean()
+    return np.sqrt((deviations * deviations).sum() / len(arr))
+
+
+def arr_mean(arr: list[float] | np.ndarray) -> float:
     """
     Calculates the mean of an array of numbers.
 
     Args:
-        arr (list[float]): The array of numbers.
+        arr (list[float] | np.ndarray): The array of numbers.
 
     Returns:
         float: The mean of the array.
     """
-    return sum(arr) / len(arr)
+    return float(_arr_mean(np.asarray(arr, dtype=np.float64)))
 
 
-def arr_std(arr: list[float]) -> float:
+def arr_std(arr: list[float] | np.ndarray) -> float:
     """
     Calculates the standard deviation of an array of numbers.
 
     Args:
-        arr (list[float]): The array of numbers.
+        arr (list[float] | np.ndarray): The array of numbers.
 
     Returns:
         float: The standard deviation of the array.
     """
-    mean = arr_mean(arr)
-    return math.sqrt(sum([(x - mean) ** 2 for x in arr]) / len(arr))
+    return float(_arr_std(np.asarray(arr, dtype=np.float64)))
+
+
+@njit(cache=True)
+def _sma_loop(readings, buf, head, filled, mean, m2, updates, resync_every):
+    """
+    Runs the sliding window updates of the simple moving average over a batch of readings,
+    the same updates as `MovingAverageAnomalyDetector.update_reading`.
+
+    Compiled with Numba when it is available.
+
+    Args:
+        readings (np.ndarray): The new readings.
+        buf (np.ndarray): Ring buffer of the window, updated in place.
+        head (int): Slot of the next value in the ring buffer.
+        filled (int): Number of values in the window.
+        mean (float): Mean of the values in the window.
+        m2 (float): Sum of squared deviations from the mean of the values in the window.
+        updates (int): Number of readings seen so far.
+        resync_every (int): Number of updates between two exact recomputations of the statistics.
+
+    Returns:
+        tuple: The means, standard deviations and z-scores of the readings, followed by
+        the final head, filled, mean, m2 and updates.
+    """
+    n = len(readings)
+    window_size = len(buf)
+    means = np.empty(n)
+    stds = np.empty(n)
+    zs = np.empty(n)
+    for i in range(n):
+        new_value = readings[i]
+        if filled == window_size:
+            old = buf[head]
+            new_mean = mean + (new_value - old) / filled
+            m2 += (new_value - old) * (new_value - new_mean + old - mean)
+            mean = new_mean
+        else:
+            filled += 1
+            delta = new_value - mean
+            mean += delta / filled
+            m2 += delta * (new_value - mean)
+
+        buf[head] = new_value
+        head += 1
+        if head == window_size:
+            head = 0
+
+        updates += 1
+        if updates % resync_every == 0:
+            view = buf[:filled]
+            std = _arr_std(view)
+            mean = _arr_mean(view)
+            m2 = std * std * filled
+
+        variance = m2 / filled
+        std = math.sqrt(variance) if variance > 0 else 0.0
+
+        means[i] = mean
+        stds[i] = std
+        zs[i] = (new_value - mean) / std if std != 0 else 0.0
+    return means, stds, zs, head, filled, mean, m2, updates
+
+
+@njit(cache=True)
+def _pewma_loop(readings, s1, s2, mean, steps, alpha, beta, training_steps):
+    """
+    Runs the PEWMA recurrence over a batch of readings.
+
+    Compiled with Numba when it is available.
+
+    Args:
+        readings (np.ndarray): The new readings.
+        s1 (float): Current first moment.
+        s2 (float): Current second moment.
+        mean (float): Current mean.
+        steps (int): Number of readings seen so far.
+        alpha (float): Weight for the moving average.
+        beta (float): Weight for the probability adjustment.
+        training_steps (int): Number of training steps.
+
+    Returns:
+        tuple: The means, standard deviations and z-scores of the readings, followed by
+        the final s1, s2, mean and steps.
+    """
+    n = len(readings)
+    means = np.empty(n)
+    stds = np.empty(n)
+    zts = np.empty(n)
+    for i in range(n):
+        reading = readings[i]
+        steps += 1
+
+        std = math.sqrt(max(s2 - s1 * s1, 0.0))
+        if std == 0:
+            zt = 0.0
+        else:
+            zt = (reading - mean) / std
 
+        pt = math.exp(-0.5 * zt * zt) * _INV_SQRT_2PI
 
-@dataclass
+        if steps < training_steps:
+            alpha_t = 1 - 1 / steps
+        else:
+            alpha_t = (1 - beta * pt) * alpha
+
+        s1 = alpha_t * s1 + (1 - alpha_t) * reading
+        s2 = alpha_t * s2 + (1 - alpha_t) * (reading * reading)
+        mean = s1
+
+        means[i] = mean
+        stds[i] = std
+        zts[i] = zt
+    return means, stds, zts, s1, s2, mean, steps
+
+
+@dataclass(slots=True)
 class DetectionResult:
     """
     Represents the result of anomaly detection.
@@ -61,6 +202,9 @@ class AbstractAnomalyDetector(ABC):
         update_reading(reading: float) -> tuple[float, float]:
             Updates the internal state of the anomaly detector with a new reading.
 
+        update_batch(readings: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            Updates the internal state of the anomaly detector with a batch of readings.
+
         is_anomaly(z_score: float) -> bool:
             Checks whether the given z-score is an anomaly.
     """
@@ -78,6 +222,50 @@ class AbstractAnomalyDetector(ABC):
         """
         raise NotImplementedError
 
+    def _update_reading_fast(self, reading: float) -> tuple[float, float, float, bool]:
+        """
+        Updates the internal state of the anomaly detector with a new reading and returns
+        the result as plain values.
+
+        The default implementation unpacks the result of `update_reading`, detectors
+        override it to skip constructing a `DetectionResult` on the batch path.
+
+        Args:
+            reading (float): The new reading.
+
+        Returns:
+            tuple[float, float, float, bool]: The expected value, safe distance, distance and
+            anomaly flag of the reading.
+        """
+        result = self.update_reading(reading)
+        return result.expected_val, result.safe_dist, result.distance, result.is_anomaly
+
+    def update_batch(
+        self, readings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Updates the internal state of the anomaly detector with a batch of readings.
+
+        The default implementation feeds the readings one by one to `_update_reading_fast`,
+        detectors that can process a whole batch at once should override it.
+
+        Args:
+            readings (np.ndarray): The new readings in order of arrival.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The expected values, safe distances,
+            distances and anomaly flags of the readings.
+        """
+        n = len(readings)
+        expected = np.empty(n)
+        safe_dist = np.empty(n)
+        distance = np.empty(n)
+        is_anomaly = np.empty(n, dtype=bool)
+        update = self._update_reading_fast
+        for i, reading in enumerate(readings.tolist()):
+            expected[i], safe_dist[i], distance[i], is_anomaly[i] = update(reading)
+        return expected, safe_dist, distance, is_anomaly
+
     @abstractmethod
     def is_anomaly(self, z_score: float) -> bool:
         """
@@ -102,40 +290,132 @@ class MovingAverageAnomalyDetector(AbstractAnomalyDetector):
 
     pros:
         - Simple to implement and understand
+        - Constant time updates, the window statistics are maintained incrementally
+          with Welford's algorithm, which is numerically stable
     cons:
         - Needs memory for the window
         - Slow adaptation to new data trends
     """
-    def __init__(self, window_size=100, threshold=3.0):
+    def __init__(self, window_size=100, threshold=3.0, resync_every=1000):
         """
         Initialize the moving average detector.
         :param window_size: Size of the moving window for calculating statistics.
         :param threshold: Z-score threshold for anomaly detection.
+        :param resync_every: Number of updates between exact recomputations of the
+            window statistics, this bounds the floating point drift of the incremental updates.
         """
         self.window_size = window_size
         self.threshold = threshold
-        self.window_vals = []
+        self.resync_every = resync_every
 
-    def update_reading(self, new_value):
-        # Append the new value to the window
-        self.window_vals.append(new_value)
+        # Ring buffer holding the window, _head is the slot of the next value
+        self._buf = np.zeros(window_size, dtype=np.float64)
+        self._head = 0
+        self._filled = 0
 
-        # If the window exceeds the size, remove the oldest value
-        if len(self.window_vals) > self.window_size:
-            self.window_vals.pop(0)
+        # Mean and sum of squared deviations from the mean of the values inside the window
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
 
-        # Calculate moving average and standard deviation
-        mean = arr_mean(self.window_vals)
-        std = arr_std(self.window_vals)
+    def _resync(self) -> None:
+        """
+        Recomputes the window statistics from the values in the window with two passes.
+        """
+        view = self._buf[: self._filled]
+        std = arr_std(view)
+        self._mean = arr_mean(view)
+        self._m2 = std * std * self._filled
+
+    def update_reading(self, new_value):
+        return DetectionResult(*self._update_reading_fast(new_value))
+
+    def _update_reading_fast(self, new_value):
+        # Work on locals and write the state back once
+        buf = self._buf
+        head = self._head
+        filled = self._filled
+        window_size = self.window_size
+        mean = self._mean
+        m2 = self._m2
+
+        if filled == window_size:
+            # The oldest value in the slot is replaced by the new value, this is
+            # Welford's update for removing one value and adding another
+            old = float(buf[head])
+            new_mean = mean + (new_value - old) / filled
+            m2 += (new_value - old) * (new_value - new_mean + old - mean)
+            mean = new_mean
+        else:
+            # Welford's update for adding a value
+            filled += 1
+            delta = new_value - mean
+            mean += delta / filled
+            m2 += delta * (new_value - mean)
+
+        # Write the new value to the window
+        buf[head] = new_value
+        head += 1
+        self._head = head if head < window_size else 0
+        self._filled = filled
+        self._mean = mean
+        self._m2 = m2
+
+        # Periodically recompute the statistics exactly to correct the accumulated drift
+        self._updates += 1
+        if self._updates % self.resync_every == 0:
+            self._resync()
+            mean = self._mean
+            m2 = self._m2
+
+        # Calculate moving standard deviation
+        variance = m2 / filled
+        std = _sqrt(variance) if variance > 0 else 0
 
         if std == 0:
-            return DetectionResult(mean, 0, 0, False)
+            return mean, 0, 0, False
 
         # Calculate the Z-score of the new point
         z_score = (new_value - mean) / std
 
-        safe_dist = std * self.threshold
-        return DetectionResult(mean, safe_dist, z_score, abs(z_score) > self.threshold)
+        threshold = self.threshold
+        return mean, std * threshold, z_score, abs(z_score) > threshold
+
+    def update_batch(
+        self, readings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Update the detector with a batch of readings using the compiled sliding window updates.
+
+        Gives the same results as calling `update_reading` on every reading, so both can be
+        mixed freely.
+
+        Args:
+            readings (np.ndarray): The new readings.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The expected values, safe distances,
+            Z-scores and anomaly flags of the readings.
+        """
+        readings = np.asarray(readings, dtype=np.float64)
+        if len(readings) == 0:
+            empty = np.empty(0)
+            return empty, empty, empty, np.empty(0, dtype=bool)
+
+        means, stds, z_scores, self._head, self._filled, self._mean, self._m2, self._updates = (
+            _sma_loop(
+                readings,
+                self._buf,
+                self._head,
+                self._filled,
+                self._mean,
+                self._m2,
+                self._updates,
+                self.resync_every,
+            )
+        )
+
+        return means, stds * self.threshold, z_scores, np.abs(z_scores) > self.threshold
 
     def is_anomaly(self, z_score):
         return abs(z_score) > self.threshold
@@ -160,39 +440,48 @@ class ExponentialMovingAverageAnomalyDetector(AbstractAnomalyDetector):
     """
     def __init__(self, alpha=0.5, threshold=3.0):
         self.alpha = alpha
+        self._one_minus_alpha = 1.0 - alpha
         self.ema = None
         self.ema_squared = None
         self.threshold = threshold
 
-    def update_reading(self, new_value) -> tuple[float, float]:
+    def update_reading(self, new_value) -> DetectionResult:
+        return DetectionResult(*self._update_reading_fast(new_value))
+
+    def _update_reading_fast(self, new_value) -> tuple[float, float, float, bool]:
+
+        new_value_squared = new_value * new_value
 
         # Initialize EMA and variance on the first point
         if self.ema is None:
             self.ema = new_value
-            self.ema_squared = new_value**2
-            return DetectionResult(new_value, 0, 0, False)
+            self.ema_squared = new_value_squared
+            return new_value, 0, 0, False
+
+        alpha = self.alpha
+        one_minus_alpha = self._one_minus_alpha
 
         # Update EMA for the new point
-        self.ema = self.alpha * new_value + (1 - self.alpha) * self.ema
+        self.ema = ema = alpha * new_value + one_minus_alpha * self.ema
 
         # Update squared EMA for variance calculation
-        self.ema_squared = (
-            self.alpha * (new_value**2) + (1 - self.alpha) * self.ema_squared
+        self.ema_squared = ema_squared = (
+            alpha * new_value_squared + one_minus_alpha * self.ema_squared
         )
 
         # Calculate variance and standard deviation
-        variance = self.ema_squared - self.ema**2
+        variance = ema_squared - ema * ema
         std_dev = (
-            math.sqrt(variance) if variance > 0 else 1e-6
+            _sqrt(variance) if variance > 0 else 1e-6
         )  # Avoid division by zero
 
-        # Calculate Z-score for the new point
-        z_score = abs(new_value - self.ema) / std_dev
+        # Calculate the absolute Z-score for the new point
+        z_score = (new_value - ema) / std_dev
+        if z_score < 0:
+            z_score = -z_score
 
-        expected = self.ema
-        return DetectionResult(
-            expected, std_dev * self.threshold, z_score, abs(z_score) > self.threshold
-        )
+        threshold = self.threshold
+        return ema, std_dev * threshold, z_score, z_score > threshold
 
     def is_anomaly(self, z_score):
         """
@@ -239,7 +528,7 @@ class PEWMAAnomalyDetector(AbstractAnomalyDetector):
         self.s1 = None
         self.s2 = None
 
-    def update_reading(self, reading: float):
+    def update_reading(self, reading: float) -> DetectionResult:
         """
         Update the PEWMA with a new reading and calculate the Z-score.
 
@@ -247,9 +536,27 @@ class PEWMAAnomalyDetector(AbstractAnomalyDetector):
             reading (float): The new reading.
 
         Returns:
-            tuple[float, float]: The current mean and Z-score.
+            DetectionResult: The result of the anomaly detection.
+        """
+        return DetectionResult(*self._update_reading_fast(reading))
+
+    def _update_reading_fast(self, reading: float) -> tuple[float, float, float, bool]:
         """
-        self.steps += 1
+        Update the PEWMA with a new reading and return the result as plain values.
+
+        Args:
+            reading (float): The new reading.
+
+        Returns:
+            tuple[float, float, float, bool]: The current mean, safe distance, Z-score and
+            whether the reading is an anomaly.
+        """
+        alpha = self.alpha
+        beta = self.beta
+        threshold = self.threshold
+        training_steps = self.training_steps
+
+        self.steps = steps = self.steps + 1
 
         # initialize parameters
         if self.s1 is None:
@@ -259,32 +566,74 @@ class PEWMAAnomalyDetector(AbstractAnomalyDetector):
         if self.mean is None:
             self.mean = reading
 
-        self.std = math.sqrt(self.s2 - self.s1**2)
+        s1 = self.s1
+        s2 = self.s2
 
-        if self.std == 0:
+        self.std = std = _sqrt(max(s2 - s1 * s1, 0.0))
+
+        if std == 0:
             zt = 0
         else:
-            zt = (reading - self.mean) / self.std
+            zt = (reading - self.mean) / std
 
-        pt = math.exp(-(zt**2) / 2) / math.sqrt(2 * math.pi)
+        pt = _exp(-0.5 * zt * zt) * _INV_SQRT_2PI
 
-        if self.steps < self.training_steps:
-            alpha_t = 1 - 1 / self.steps
+        if steps < training_steps:
+            alpha_t = 1 - 1 / steps
         else:
-            alpha_t = (1 - self.beta * pt) * self.alpha
+            alpha_t = (1 - beta * pt) * alpha
+
+        self.s1 = s1 = alpha_t * s1 + (1 - alpha_t) * reading
+        self.s2 = alpha_t * s2 + (1 - alpha_t) * (reading * reading)
 
-        self.s1 = alpha_t * self.s1 + (1 - alpha_t) * reading
-        self.s2 = alpha_t * self.s2 + (1 - alpha_t) * reading**2
+        self.mean = s1
 
-        self.mean = self.s1
+        safe_dist = std * threshold
 
-        safe_dist = self.std * self.threshold
+        return s1, safe_dist, zt, steps >= training_steps and abs(zt) > threshold
 
-        return (
-            DetectionResult(self.mean, safe_dist, zt, self.is_anomaly(zt))
-            if self.steps >= self.training_steps
-            else DetectionResult(self.mean, safe_dist, zt, False)
+    def update_batch(
+        self, readings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Update the PEWMA with a batch of readings using the compiled recurrence.
+
+        Args:
+            readings (np.ndarray): The new readings.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The expected values, safe distances,
+            Z-scores and anomaly flags of the readings.
+        """
+        readings = np.asarray(readings, dtype=np.float64)
+        if len(readings) == 0:
+            empty = np.empty(0)
+            return empty, empty, empty, np.empty(0, dtype=bool)
+
+        # initialize parameters
+        if self.s1 is None:
+            self.s1 = float(readings[0])
+        if self.s2 is None:
+            self.s2 = float(readings[0]) ** 2
+        if self.mean is None:
+            self.mean = float(readings[0])
+
+        first_step = self.steps + 1
+        means, stds, zts, self.s1, self.s2, self.mean, self.steps = _pewma_loop(
+            readings,
+            self.s1,
+            self.s2,
+            self.mean,
+            self.steps,
+            self.alpha,
+            self.beta,
+            self.training_steps,
         )
+        self.std = float(stds[-1])
+
+        trained = np.arange(first_step, self.steps + 1) >= self.training_steps
+        is_anomaly = trained & (np.abs(zts) > self.threshold)
+        return means, stds * self.threshold, zts, is_anomaly
 
     def is_anomaly(self, z_score: float) -> bool:
         """
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import random
 
+import numpy as np
+
 
 class AbstractAnomalyGenerator(ABC):
     """
@@ -18,11 +20,35 @@ class AbstractAnomalyGenerator(ABC):
 
             Returns:
                 tuple[float, bool]: A tuple containing the next value of the stream and a boolean indicating whether an anomaly was added.
+
+        add_anomaly_batch(n: int, delta: float) -> tuple[np.ndarray, np.ndarray]:
+            Adds anomalies to the next n values of the stream.
     """
     @abstractmethod
     def add_anomaly(self, delta: float) -> tuple[float, bool]:
         pass
 
+    def add_anomaly_batch(self, n: int, delta: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advances the anomaly generator by n steps of delta each.
+
+        The default implementation calls `add_anomaly` n times, generators that can
+        produce a whole batch at once should override it.
+
+        Args:
+            n (int): Number of steps.
+            delta (float): Time between consecutive steps.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The anomaly values to add to the stream and whether
+            each step is part of an anomaly.
+        """
+        vals = np.zeros(n)
+        flags = np.zeros(n, dtype=bool)
+        for i in range(n):
+            vals[i], flags[i] = self.add_anomaly(delta)
+        return vals, flags
+
 
 
 class RandomizedSpikeAnomalyAdder(AbstractAnomalyGenerator):
@@ -126,6 +152,74 @@ class RandomizedSpikeAnomalyAdder(AbstractAnomalyGenerator):
                 / (0.5 * self.current_spike_duration)
             )
 
+    def _get_spike_amps(self, anomaly_times: np.ndarray) -> np.ndarray:
+        """
+        Calculates the amplitude of the current spike at several times since its start.
+
+        Vectorized version of `_get_current_spike_amp`.
+
+        Args:
+            anomaly_times (np.ndarray): Times elapsed since the start of the spike in hours.
+
+        Returns:
+            np.ndarray: The amplitudes of the spike at the given times.
+        """
+        half_duration = 0.5 * self.current_spike_duration
+        return self.current_spike_amp * np.where(
+            anomaly_times <= half_duration,
+            anomaly_times / half_duration,
+            (self.current_spike_duration - anomaly_times) / half_duration,
+        )
+
+    def add_anomaly_batch(self, n: int, delta: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advances the anomaly simulator by n steps of delta hours.
+
+        Gives the same result as n calls to `add_anomaly`, but only loops over the
+        starts and ends of spikes, which are rare. The times at which the state changes
+        are found with a binary search and the spikes are written as slices.
+
+        Args:
+            n (int): Number of steps.
+            delta (float): Time in hours between consecutive steps.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The amplitude of the anomaly at each step and whether
+            each step is in the middle of an anomaly.
+        """
+        vals = np.zeros(n)
+        flags = np.zeros(n, dtype=bool)
+        if n == 0:
+            return vals, flags
+
+        # Accumulate the time the same way repeated calls to add_anomaly do
+        steps = np.full(n + 1, delta, dtype=np.float64)
+        steps[0] = self.t
+        ts = np.cumsum(steps)[1:]
+        self.t = float(ts[-1])
+
+        i = 0
+        while i < n:
+            elapsed = ts[i:] - self.last_anomaly_time
+            if self.is_applying:
+                j = i + int(np.searchsorted(elapsed, self.current_spike_duration))
+                vals[i:j] = self._get_spike_amps(elapsed[: j - i])
+                flags[i:j] = True
+                if j < n:
+                    self.is_applying = False
+                    self.last_anomaly_time = float(ts[j])
+            else:
+                j = i + int(np.searchsorted(elapsed, self.next_anomaly_time))
+                if j < n:
+                    self.next_anomaly_time = self._get_random_anomaly_time()
+                    self.current_spike_duration = self._get_random_spike_duration()
+                    self.current_spike_amp = self._get_random_spike_amplitude()
+                    self.is_applying = True
+                    self.last_anomaly_time = float(ts[j])
+            i = j + 1
+
+        return vals, flags
+
     def add_anomaly(self, delta) -> tuple[float, bool]:
         """
         Advances the anomaly simulator by delta hours.
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
 from anomaly_detector import (
     ExponentialMovingAverageAnomalyDetector,
     MovingAverageAnomalyDetector,
     PEWMAAnomalyDetector,
 )
-from simulation_manager import SimulationManager
+from simulation_manager import PointArrays, SimulationManager
 
 
 class SimulationGUI:
@@ -22,7 +24,8 @@ class SimulationGUI:
         self.call_id = None
 
         # Store points
-        self.points = []
+        self.points: PointArrays = None
+        self._last_t = None
         self.create_gui()
 
     def on_closing(self):
@@ -45,6 +48,7 @@ class SimulationGUI:
         )
 
         self.ax1_side = self.ax1.twinx()
+        self.create_artists()
 
         # Create a canvas for the matplotlib figure
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
@@ -89,18 +93,95 @@ class SimulationGUI:
         self.root.grid_rowconfigure(2, weight=1)
         self.root.grid_columnconfigure(1, weight=0)
 
+    def create_artists(self):
+        """
+        Creates the plot artists once, so updates only have to replace their data.
+
+        Titles, labels, limits and legends are static and are set here. The lines
+        start empty and are filled by `update_graph`.
+        """
+        for ax in (self.ax1, self.ax2, self.ax3):
+            ax.xaxis_date()
+
+        # Plot Value over Time
+        self.ax1.set_title("Data stream")
+        self.ax1.set_ylabel("Value", color="blue")
+        self.ax1.tick_params(axis="y", labelcolor="blue")
+        (self.signal_line,) = self.ax1.plot([], [], label="signal")
+        (self.expected_line,) = self.ax1.plot(
+            [],
+            [],
+            label="Expected Value",
+            color="green",
+            linestyle="dashed",
+        )
+        self.safe_fill = self.ax1.fill_between(
+            [],
+            [],
+            [],
+            color="yellow",
+            alpha=0.2,
+            label="Safe Distance",
+        )
+        self.ax1.legend(loc = "upper left")
+
+        (self.truth_line,) = self.ax1_side.plot(
+            [], [], label="Value", color="red", linestyle="dotted"
+        )
+        self.ax1_side.set_ylabel("Anomaly (Truth)", color="red")
+        self.ax1_side.set_ylim(0, 1)
+        self.ax1_side.yaxis.set_label_position("right")
+        self.ax1_side.tick_params(axis="y", labelcolor="red")
+
+        # Plot Z-Score over Time
+        self.ax2.set_title("Z-Score")
+        (self.z_line,) = self.ax2.plot([], [], color="blue", label="Z-Score")
+        self.ax2.set_ylabel("Absolute Z-Score")
+        self.ax2.set_ylim(0, 7)
+        self.ax2.grid()
+        self.ax2.legend()
+
+        # Plot Anomaly Detection over Time
+        self.ax3.set_title("Anomaly Detection")
+        (self.detected_line,) = self.ax3.plot(
+            [], [], color="red", label="Anomaly (Detected)"
+        )
+        self.ax3.set_ylabel("Anomaly")
+        self.ax3.set_xlabel("Time")
+        self.ax3.set_ylim(0, 1)
+        self.ax3.legend(loc = "upper right")
+
+    def reset_artists(self):
+        """
+        Empties the plot artists, keeping them for the next simulation.
+        """
+        for line in (
+            self.signal_line,
+            self.expected_line,
+            self.truth_line,
+            self.z_line,
+            self.detected_line,
+        ):
+            line.set_data([], [])
+        self.safe_fill.remove()
+        self.safe_fill = self.ax1.fill_between(
+            [], [], [], color="yellow", alpha=0.2, label="Safe Distance"
+        )
+
     def start_simulation(self):
         """
         Starts the simulation with the selected anomaly detector.
 
         Cancels any existing simulation and schedules the first update of the
         graph using the selected anomaly detector. The selected detector is
-        created with default parameters.
+        created with default parameters. On a restart the existing simulation
+        manager and plot artists are reset and reused.
 
         """
         if self.call_id is not None:
             self.root.after_cancel(self.call_id)
             self.call_id = None
+        self._last_t = None
 
         match self.option_var.get():
             case "SMA":
@@ -118,9 +199,13 @@ class SimulationGUI:
             case _:
                 raise ValueError("Invalid option")
 
-        self.simulation_manager = SimulationManager(
-            window_max=7000, delta=0.5, every_n_sample=4, detector=detector
-        )
+        if self.simulation_manager is None:
+            self.simulation_manager = SimulationManager(
+                window_max=7000, delta=0.5, every_n_sample=4, detector=detector
+            )
+        else:
+            self.simulation_manager.reset(detector)
+            self.reset_artists()
         self.update_graph()
 
     def update_graph(self):
@@ -129,46 +214,37 @@ class SimulationGUI:
         Updates the graph with new data points from the simulation.
 
         This function is called recursively to update the graph at regular
-        intervals. It clears the old plots, extracts the new data from the
-        simulation, and plots the new data. The graph is then redrawn and the
-        function schedules itself to be called again after 1 second.
+        intervals. It replaces the data of the existing artists with the new
+        data from the simulation and rescales the axes. The canvas is then
+        redrawn and the function schedules itself to be called again after 100 ms.
+        The redraw is skipped when the simulation produced no new points.
 
         """
-        new_points = self.simulation_manager.step(250)
-        self.points = new_points
-
-        # Clear old plots
-        self.ax1.clear()
-        self.ax2.clear()
-        self.ax3.clear()
-        self.ax1_side.clear()
-
-        # Extract data
-        times = [point.t for point in self.points]
-        values = [point.val for point in self.points]
-        truth = [point.has_anomaly for point in self.points]
-        z_scores = [abs(point.result.distance) for point in self.points]
-        is_anomalies = [1 if point.result.is_anomaly else 0 for point in self.points]
-        upper_bounds = [
-            point.result.expected_val + point.result.safe_dist for point in self.points
-        ]
-        lower_bounds = [
-            point.result.expected_val - point.result.safe_dist for point in self.points
-        ]
+        self.points = self.simulation_manager.step_batch(250)
 
-        # Plot Value over Time
-        self.ax1.set_title("Data stream")
-        self.ax1.set_ylabel("Value", color="blue")
-        self.ax1.tick_params(axis="y", labelcolor="blue")
-        self.ax1.plot(times, values, label="signal")
-        self.ax1.plot(
-            times,
-            [point.result.expected_val for point in self.points],
-            label="Expected Value",
-            color="green",
-            linestyle="dashed",
-        )
-        self.ax1.fill_between(
+        # Nothing changed since the last frame, only schedule the next update
+        if len(self.points) == 0 or self.points.t[-1] == self._last_t:
+            self.call_id = self.root.after(100, self.update_graph)
+            return
+        self._last_t = self.points.t[-1]
+
+        # Extract data, the times are converted to matplotlib dates once for all artists
+        times = mdates.date2num(self.points.t)
+        values = self.points.val
+        truth = self.points.has_anomaly
+        z_scores = np.abs(self.points.distance)
+        is_anomalies = self.points.is_anomaly.astype(int)
+        upper_bounds = self.points.expected_val + self.points.safe_dist
+        lower_bounds = self.points.expected_val - self.points.safe_dist
+
+        # Update Value over Time
+        self.signal_line.set_data(times, values)
+        self.expected_line.set_data(times, self.points.expected_val)
+        self.truth_line.set_data(times, truth)
+
+        # The band is a polygon, it is cheaper to rebuild it than to edit its vertices
+        self.safe_fill.remove()
+        self.safe_fill = self.ax1.fill_between(
             times,
             lower_bounds,
             upper_bounds,
@@ -176,33 +252,18 @@ class SimulationGUI:
             alpha=0.2,
             label="Safe Distance",
         )
-        self.ax1.legend(loc = "upper left")
-
-        self.ax1_side.plot(
-            times, truth, label="Value", color="red", linestyle="dotted"
-        )
-        self.ax1_side.set_ylabel("Anomaly (Truth)", color="red")
-        self.ax1_side.set_ylim(0, 1)
-        self.ax1_side.yaxis.set_label_position("right")
-        self.ax1_side.tick_params(axis="y", labelcolor="red")
+        self.ax1.relim()
+        self.ax1_side.relim()
+        self.ax1.autoscale_view()
 
-        # Plot Z-Score over Time
-        self.ax2.set_title("Z-Score")
-        self.ax2.plot(times, z_scores, color="blue", label="Z-Score")
-        self.ax2.set_ylabel("Absolute Z-Score")
-        self.ax2.set_ylim(0, 7)
-        self.ax2.grid()
-        self.ax2.legend()
-
-        # Plot Anomaly Detection over Time
-        self.ax3.set_title("Anomaly Detection")
-        self.ax3.plot(times, is_anomalies, color="red", label="Anomaly (Detected)")
-        self.ax3.set_ylabel("Anomaly")
-        self.ax3.set_xlabel("Time")
-        self.ax3.set_ylim(0, 1)
-        self.ax3.legend(loc = "upper right")
+        # Update Z-Score and Anomaly Detection over Time
+        self.z_line.set_data(times, z_scores)
+        self.detected_line.set_data(times, is_anomalies)
+        for ax in (self.ax2, self.ax3):
+            ax.relim()
+            ax.autoscale_view(scaley=False)
 
         # Redraw the canvas
-        self.canvas.draw()
+        self.canvas.draw_idle()
         # Schedule the next update after 100 ms
         self.call_id = self.root.after(100, self.update_graph)  # store call id
@@ -1,12 +1,21 @@
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from anomaly_detector import *
 from stream_generator import *
 from anomaly_generator import *
 
+_MICROSECONDS_PER_HOUR = 3600 * 1_000_000
 
-@dataclass
+# Smaller steps are simulated one point at a time, the batch path only pays off
+# for larger ones
+_BATCH_STEP_MIN = 16
+
+
+@dataclass(slots=True)
 class Point:
     """
     Represents a single point in the simulation.
@@ -24,6 +33,127 @@ class Point:
     result: DetectionResult
 
 
+@dataclass
+class PointArrays:
+    """
+    Represents a sequence of points in the simulation stored column-wise.
+
+    Attributes:
+        t (np.ndarray): Timestamps of the points as datetime64.
+        val (np.ndarray): Values of the points.
+        has_anomaly (np.ndarray): Whether each point has an anomaly.
+        expected_val (np.ndarray): Expected value of each point.
+        safe_dist (np.ndarray): Safe distance from the expected value of each point.
+        distance (np.ndarray): The distance from the expected value of each point.
+        is_anomaly (np.ndarray): Whether each point was detected as an anomaly.
+    """
+
+    t: np.ndarray
+    val: np.ndarray
+    has_anomaly: np.ndarray
+    expected_val: np.ndarray
+    safe_dist: np.ndarray
+    distance: np.ndarray
+    is_anomaly: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.val)
+
+
+class WindowArrays:
+    """
+    A fixed size window of points stored column-wise in ring buffers.
+
+    Every column is allocated twice the window size and each value is written both at
+    its ring position and at its mirror, one window size further. This way the points
+    in chronological order are always a contiguous slice of the buffers and can be
+    returned as views without copying.
+    """
+
+    def __init__(self, size: int):
+        """
+        Allocates the buffers of the window.
+
+        Args:
+            size (int): Maximum number of points in the window.
+        """
+        self.size = size
+        self.head = 0
+        self.filled = 0
+
+        self.t = np.empty(2 * size, dtype="datetime64[us]")
+        self.val = np.zeros(2 * size, dtype=np.float32)
+        self.has_anomaly = np.zeros(2 * size, dtype=bool)
+        self.expected_val = np.zeros(2 * size, dtype=np.float32)
+        self.safe_dist = np.zeros(2 * size, dtype=np.float32)
+        self.distance = np.zeros(2 * size, dtype=np.float32)
+        self.is_anomaly = np.zeros(2 * size, dtype=bool)
+
+    def __len__(self) -> int:
+        return self.filled
+
+    def _write(self, buf: np.ndarray, vals: np.ndarray) -> None:
+        """
+        Writes values to a buffer at the head of the ring and at their mirror.
+
+        Args:
+            buf (np.ndarray): The buffer to write to.
+            vals (np.ndarray): The values to write, at most the window size.
+        """
+        head, size, k = self.head, self.size, len(vals)
+        buf[head : head + k] = vals
+        end = min(head + k, size)
+        buf[head + size : end + size] = vals[: end - head]
+        if head + k > size:
+            buf[: head + k - size] = vals[size - head :]
+
+    def append(self, points: PointArrays) -> None:
+        """
+        Appends points to the window, dropping the oldest points if it is full.
+
+        Args:
+            points (PointArrays): The points to append.
+        """
+        k = min(len(points), self.size)
+        start = len(points) - k
+        self._write(self.t, points.t[start:])
+        self._write(self.val, points.val[start:])
+        self._write(self.has_anomaly, points.has_anomaly[start:])
+        self._write(self.expected_val, points.expected_val[start:])
+        self._write(self.safe_dist, points.safe_dist[start:])
+        self._write(self.distance, points.distance[start:])
+        self._write(self.is_anomaly, points.is_anomaly[start:])
+
+        self.head = (self.head + k) % self.size
+        self.filled = min(self.filled + k, self.size)
+
+    def clear(self) -> None:
+        """
+        Empties the window, keeping its buffers.
+        """
+        self.head = 0
+        self.filled = 0
+
+    def points(self) -> PointArrays:
+        """
+        Returns the points in the window in chronological order.
+
+        Returns:
+            PointArrays: Views of the buffers holding the points of the window.
+        """
+        start = (self.head - self.filled) % self.size
+        end = start + self.filled
+        return PointArrays(
+            self.t[start:end],
+            self.val[start:end],
+            self.has_anomaly[start:end],
+            self.expected_val[start:end],
+            self.safe_dist[start:end],
+            self.distance[start:end],
+            self.is_anomaly[start:end],
+        )
+
+
 class SimulationManager:
     """
     Manages a simulation of a time series with anomalies.
@@ -57,46 +187,224 @@ class SimulationManager:
         self.detector = detector
         self.generator = generator
         self.anomaly_adder = anomaly_adder
-        self.window: list[Point] = []
+        # window_arrays holds the points, window is a copy of them as Point objects for
+        # step that is rebuilt from window_arrays after points were added by step_batch.
+        # Points of small steps are only added to window, they wait in _pending until
+        # they are appended to window_arrays.
+        self.window: deque[Point] = deque(maxlen=window_max)
+        self.window_arrays = WindowArrays(window_max)
+        self._window_stale = False
+        self._pending: list[Point] = []
         self.every_n_sample = every_n_sample
         self.steps = 0
 
         self.last_detection = None
         self.t = 0.0
 
-    def step(self, n: int = 1) -> list[Point]:
+    def reset(self, detector: AbstractAnomalyDetector | None = None) -> None:
+        """
+        Restarts the simulation from the start time, reusing the allocated window.
+
+        Args:
+            detector (AbstractAnomalyDetector, optional): A fresh detector to use from now on.
+                Defaults to keeping the current detector.
+        """
+        if detector is not None:
+            self.detector = detector
+        self.window.clear()
+        self.window_arrays.clear()
+        self._window_stale = False
+        self._pending.clear()
+        self.steps = 0
+        self.t = 0.0
+        self.last_detection = None
+
+    def step(self, n: int = 1) -> deque[Point]:
         """
         Advances the simulation by a specified number of steps.
 
+        Steps of fewer than `_BATCH_STEP_MIN` points are simulated one point at a time,
+        larger ones use the batch methods like `step_batch`.
+
+        Args:
+            n (int, optional): Number of steps to advance the simulation. Defaults to 1.
+
+        Returns:
+            deque[Point]: The Points in the window representing the new state of the simulation.
+        """
+        if self._window_stale:
+            # Points were added by step_batch, rebuild the deque from the whole window
+            self.window.clear()
+            self.window.extend(self._to_points(self.window_arrays.points()))
+            self._window_stale = False
+
+        if n < _BATCH_STEP_MIN:
+            points = self._advance_points(n)
+            pending = self._pending
+            pending.extend(points)
+            if len(pending) > self.window_max:
+                del pending[: len(pending) - self.window_max]
+        else:
+            self._flush_pending()
+            new = self._advance(n)
+            self.window_arrays.append(new)
+            points = self._to_points(new)
+
+        # The deque drops the oldest points once it reaches window_max
+        self.window.extend(points)
+
+        return self.window
+
+    def step_batch(self, n: int = 1) -> PointArrays:
+        """
+        Advances the simulation by a specified number of steps, processing all of them at once.
+
+        The stream, the anomalies and the detection are computed for the whole batch
+        using the batch methods of the generator, anomaly adder and detector.
+
         Args:
             n (int, optional): Number of steps to advance the simulation. Defaults to 1.
 
+        The Point objects of `window` are not created here, the next call of `step`
+        rebuilds them from the window, so both methods can be mixed. The rebuilt points
+        carry the float32 precision of the window columns.
+
+        Returns:
+            PointArrays: The points in the window representing the new state of the simulation.
+        """
+        self._flush_pending()
+        self.window_arrays.append(self._advance(n))
+        self._window_stale = True
+
+        return self.window_arrays.points()
+
+    def _flush_pending(self) -> None:
+        """
+        Appends the points of small steps that are not in window_arrays yet.
+        """
+        pending = self._pending
+        if not pending:
+            return
+        self.window_arrays.append(
+            PointArrays(
+                np.array([p.t for p in pending], dtype="datetime64[us]"),
+                np.array([p.val for p in pending], dtype=np.float64),
+                np.array([p.has_anomaly for p in pending], dtype=bool),
+                np.array([p.result.expected_val for p in pending], dtype=np.float64),
+                np.array([p.result.safe_dist for p in pending], dtype=np.float64),
+                np.array([p.result.distance for p in pending], dtype=np.float64),
+                np.array([p.result.is_anomaly for p in pending], dtype=bool),
+            )
+        )
+        pending.clear()
+
+    @staticmethod
+    def _to_points(points: PointArrays) -> list[Point]:
+        """
+        Converts column-wise points to Point objects.
+
+        Args:
+            points (PointArrays): The points to convert.
+
         Returns:
-            list[Point]: List of Points representing the new state of the simulation.
+            list[Point]: The points in the same order.
         """
+        return [
+            Point(t, val, has_anomaly, DetectionResult(expected_val, safe_dist, distance, is_anomaly))
+            for t, val, has_anomaly, expected_val, safe_dist, distance, is_anomaly in zip(
+                points.t.tolist(),
+                points.val.tolist(),
+                points.has_anomaly.tolist(),
+                points.expected_val.tolist(),
+                points.safe_dist.tolist(),
+                points.distance.tolist(),
+                points.is_anomaly.tolist(),
+            )
+        ]
+
+    def _advance_points(self, n: int) -> list[Point]:
+        """
+        Generates the next n points of the simulation one at a time with the scalar methods
+        of the generator, anomaly adder and detector.
+
+        Args:
+            n (int): Number of points to generate.
+
+        Returns:
+            list[Point]: The new points.
+        """
+        generate_next = self.generator.generate_next
+        add_anomaly = self.anomaly_adder.add_anomaly
+        update_reading = self.detector.update_reading
+        delta = self.delta
+        every = self.every_n_sample
 
         points: list[Point] = []
         for _ in range(n):
-            val = self.generator.generate_next(self.delta)
-            anomaly_val, flag = self.anomaly_adder.add_anomaly(self.delta)
-
+            val = generate_next(delta)
+            anomaly_val, flag = add_anomaly(delta)
             val += anomaly_val
-            if self.steps % self.every_n_sample == 0:
-                result = self.detector.update_reading(val)
-                self.last_detection = result
-
-            point = Point(
-                self.start_time + timedelta(hours=self.t),
-                val,
-                flag,
-                self.last_detection,
+
+            if self.steps % every == 0:
+                self.last_detection = update_reading(val)
+
+            points.append(
+                Point(self.start_time + timedelta(hours=self.t), val, flag, self.last_detection)
             )
-            self.t += self.delta
+            self.t += delta
             self.steps += 1
-            points.append(point)
+        return points
 
-        self.window.extend(points)
-        if len(self.window) > self.window_max:
-            self.window = self.window[len(self.window) - self.window_max :]
+    def _advance(self, n: int) -> PointArrays:
+        """
+        Generates the next n points of the simulation and runs the detector on them.
 
-        return self.window
+        Args:
+            n (int): Number of points to generate.
+
+        Returns:
+            PointArrays: The new points.
+        """
+        vals = self.generator.generate_batch(n, self.delta)
+        anomaly_vals, flags = self.anomaly_adder.add_anomaly_batch(n, self.delta)
+        vals += anomaly_vals
+
+        # Only every n-th sample is passed to the detector, each result is repeated
+        # for the following samples. The samples before the first sampled one in
+        # this batch keep the last detection result.
+        every = self.every_n_sample
+        first = min((-self.steps) % every, n)
+        results = self.detector.update_batch(vals[first::every])
+        if first > 0:
+            last = self.last_detection
+            leading = (last.expected_val, last.safe_dist, last.distance, last.is_anomaly)
+        else:
+            leading = (0.0, 0.0, 0.0, False)
+        expected, safe_dist, distance, is_anomaly = (
+            np.concatenate(
+                (np.full(first, lead, dtype=res.dtype), np.repeat(res, every)[: n - first])
+            )
+            for lead, res in zip(leading, results)
+        )
+
+        if len(results[0]) > 0:
+            self.last_detection = DetectionResult(
+                float(expected[-1]), float(safe_dist[-1]), float(distance[-1]), bool(is_anomaly[-1])
+            )
+
+        hours = self.t + self.delta * np.arange(n)
+        times = np.datetime64(self.start_time, "us") + np.round(
+            hours * _MICROSECONDS_PER_HOUR
+        ).astype("timedelta64[us]")
+        self.t += self.delta * n
+        self.steps += n
+
+        return PointArrays(
+            times,
+            vals,
+            flags,
+            expected,
+            safe_dist,
+            distance,
+            is_anomaly,
+        )
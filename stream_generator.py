@@ -1,6 +1,68 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 import math
-import random
+import os
+
+import numpy as np
+
+from _njit import NUMBA_AVAILABLE, njit, prange
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
+_sin = math.sin
+_cos = math.cos
+_floor = math.floor
+
+# Environment variable selecting the CUDA device of the GPU batches
+_GPU_DEVICE_ENV = "ANOMALY_GPU_DEVICE"
+
+# Number of noise samples drawn at once by the scalar path
+_NOISE_BUFFER_SIZE = 8192
+
+# Number of values generated at once by StreamGenerator.stream
+_STREAM_BATCH_SIZE = 8192
+
+# Number of steps the scalar path advances its sines and cosines by rotation before
+# recomputing them, each rotation adds a rounding error of about 1e-16 so the drift
+# stays below 1e-13 between two recomputations
+_RESYNC_STEPS = 1024
+
+# Ways of evaluating the sines and cosines of the pattern, the kernels get the index
+# of the mode in _TRIG_MODES
+_TRIG_MODES = ("exact", "poly", "lut")
+_TRIG_EXACT = 0
+_TRIG_POLY = 1
+_TRIG_LUT = 2
+
+# Table of the sine over one period for the "lut" mode, the angle is rounded to the
+# nearest entry so the error is at most pi/_LUT_SIZE, about 8e-4
+_LUT_SIZE = 4096
+_LUT_MASK = _LUT_SIZE - 1
+_LUT_QUARTER = _LUT_SIZE // 4
+_LUT_SCALE = _LUT_SIZE / (2 * math.pi)
+_LUT_SIN = np.sin(np.arange(_LUT_SIZE) / _LUT_SCALE)
+_LUT_SIN_LIST = _LUT_SIN.tolist()
+
+# Pi split in two parts for an accurate range reduction, and its inverse
+_PI_HI = 3.141592653589793
+_PI_LO = 1.2246467991473532e-16
+_INV_PI = 1.0 / math.pi
+
+# Minimax coefficients of sin and cos on [-pi/2, pi/2], the maximum errors are
+# about 3e-9 and 5e-8 which is far below the noise of the stream
+_SIN_1 = 0.9999999765948875
+_SIN_3 = -0.16666647637840745
+_SIN_5 = 0.008332899877217206
+_SIN_7 = -0.0001980090105672314
+_SIN_9 = 2.5904951180463156e-06
+_COS_0 = 0.9999999534789009
+_COS_2 = -0.49999905366577957
+_COS_4 = 0.041663585161411096
+_COS_6 = -0.0013853707814241486
+_COS_8 = 2.3154012129637205e-05
 
 
 class StreamGenerator(ABC):
@@ -24,6 +86,327 @@ class StreamGenerator(ABC):
         """
         raise NotImplementedError
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Makes `gen(delta)` the same as `gen.generate_next(delta)`.
+
+        `__call__` is bound directly to the generator's own `generate_next` so that calling
+        the generator costs no extra frame.
+        """
+        super().__init_subclass__(**kwargs)
+        if "generate_next" in cls.__dict__ and "__call__" not in cls.__dict__:
+            cls.__call__ = cls.generate_next
+
+    def generate_batch(self, n: int, delta: float, dtype=np.float64) -> np.ndarray:
+        """
+        Generates the next n values of the stream, each one delta after the previous.
+
+        The default implementation calls `generate_next` n times, generators that can
+        produce a whole batch at once should override it.
+
+        Args:
+            n (int): Number of values to generate.
+            delta (float): Time between consecutive values.
+            dtype (np.dtype): Data type of the returned values (default: np.float64).
+
+        Returns:
+            np.ndarray: The next n values of the stream.
+        """
+        generate_next = self.generate_next
+        return np.array([generate_next(delta) for _ in range(n)], dtype=dtype)
+
+    def generate_batch_into(self, out: np.ndarray, delta: float) -> np.ndarray:
+        """
+        Generates the next len(out) values of the stream into an existing array.
+
+        The default implementation copies the result of `generate_batch` into out, so it
+        still allocates the whole batch. Generators that can write the values in place
+        should override it.
+
+        Args:
+            out (np.ndarray): Array the values are written to.
+            delta (float): Time between consecutive values.
+
+        Returns:
+            np.ndarray: The out array.
+        """
+        out[...] = self.generate_batch(len(out), delta, dtype=out.dtype)
+        return out
+
+    def stream(self, delta: float, n: int | None = None) -> Iterator:
+        """
+        Iterates over the next values of the stream, each one delta after the previous.
+
+        The values are generated `_STREAM_BATCH_SIZE` at a time with `generate_batch`, so
+        the time of the generator runs ahead of the values handed out by up to one batch.
+
+        Args:
+            delta (float): Time between consecutive values.
+            n (int | None): Number of values to generate, None for an endless stream (default: None).
+
+        Yields:
+            float: The next value of the stream, or the next array of values for generators
+            of several streams.
+        """
+        remaining = n
+        while remaining is None or remaining > 0:
+            size = _STREAM_BATCH_SIZE if remaining is None else min(remaining, _STREAM_BATCH_SIZE)
+            if remaining is not None:
+                remaining -= size
+            batch = self.generate_batch(size, delta)
+            yield from batch.tolist() if batch.ndim == 1 else batch
+
+
+def _float_dtype(dtype) -> np.dtype:
+    """
+    Checks that a batch data type is one the generators can compute in.
+
+    Args:
+        dtype (np.dtype): The requested data type.
+
+    Returns:
+        np.dtype: The data type as a NumPy dtype.
+
+    Raises:
+        ValueError: If the data type is neither float32 nor float64.
+    """
+    dtype = np.dtype(dtype)
+    if dtype != np.float32 and dtype != np.float64:
+        raise ValueError("Batch dtype must be float32 or float64")
+    return dtype
+
+
+def _reduced_angle(arg: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Converts float64 angles to the batch data type.
+
+    For float32 the angles are first reduced to [0, 2pi) in float64, the large angles of
+    long running streams would otherwise lose most of their precision in the cast.
+
+    Args:
+        arg (np.ndarray): Angles in radians, as float64.
+        dtype (np.dtype): Data type of the batch.
+
+    Returns:
+        np.ndarray: The angles in the batch data type.
+    """
+    if dtype == np.float64:
+        return arg
+    return np.remainder(arg, 2 * np.pi).astype(dtype)
+
+
+@njit(cache=True, fastmath=True)
+def _fast_sincos(x):
+    """
+    Approximates the sine and cosine of an angle with polynomials.
+
+    The angle is reduced to r in [-pi/2, pi/2] with x = r + k*pi, then sin(x) and cos(x)
+    are the polynomials of r with the sign of (-1)^k. There are no branches, so it works
+    on scalars and on NumPy arrays alike.
+
+    Args:
+        x (float | np.ndarray): The angle in radians.
+
+    Returns:
+        tuple: The approximate sine and cosine of the angle.
+    """
+    k = np.floor(x * _INV_PI + 0.5)
+    r = (x - k * _PI_HI) - k * _PI_LO
+    sign = 1.0 - 2.0 * (k - 2.0 * np.floor(0.5 * k))
+    r2 = r * r
+    s = r * (_SIN_1 + r2 * (_SIN_3 + r2 * (_SIN_5 + r2 * (_SIN_7 + r2 * _SIN_9))))
+    c = _COS_0 + r2 * (_COS_2 + r2 * (_COS_4 + r2 * (_COS_6 + r2 * _COS_8)))
+    return sign * s, sign * c
+
+
+@njit(cache=True, fastmath=True)
+def _sincos(x, trig):
+    """
+    Calculates the sine and cosine of an angle in one of the trig modes.
+
+    The "lut" mode reads both from the sine table, the cosine being the sine a quarter
+    period later. The masks wrap the index around the table for any angle.
+
+    Args:
+        x (float): The angle in radians.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+
+    Returns:
+        tuple: The sine and cosine of the angle.
+    """
+    if trig == _TRIG_POLY:
+        return _fast_sincos(x)
+    if trig == _TRIG_LUT:
+        k = int(math.floor(x * _LUT_SCALE + 0.5))
+        return _LUT_SIN[k & _LUT_MASK], _LUT_SIN[(k + _LUT_QUARTER) & _LUT_MASK]
+    return math.sin(x), math.cos(x)
+
+
+def _sincos_scalar(x: float, trig: int) -> tuple[float, float]:
+    """
+    Calculates the sine and cosine of an angle in one of the trig modes in plain Python.
+
+    Gives the same values as `_sincos` for the scalar path of the generator, without the
+    cost of calling a compiled function and with Python floats as results. Only the
+    polynomials are faster through `_sincos` when it is compiled with Numba.
+
+    Args:
+        x (float): The angle in radians.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+
+    Returns:
+        tuple[float, float]: The sine and cosine of the angle.
+    """
+    if trig == _TRIG_LUT:
+        k = _floor(x * _LUT_SCALE + 0.5)
+        return _LUT_SIN_LIST[k & _LUT_MASK], _LUT_SIN_LIST[(k + _LUT_QUARTER) & _LUT_MASK]
+    if trig == _TRIG_POLY:
+        k = _floor(x * _INV_PI + 0.5)
+        r = (x - k * _PI_HI) - k * _PI_LO
+        r2 = r * r
+        s = r * (_SIN_1 + r2 * (_SIN_3 + r2 * (_SIN_5 + r2 * (_SIN_7 + r2 * _SIN_9))))
+        c = _COS_0 + r2 * (_COS_2 + r2 * (_COS_4 + r2 * (_COS_6 + r2 * _COS_8)))
+        if k & 1:
+            return -s, -c
+        return s, c
+    return _sin(x), _cos(x)
+
+
+def _sincos_array(x: np.ndarray, trig: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the sines and cosines of an array of angles in one of the trig modes.
+
+    Args:
+        x (np.ndarray): The angles in radians.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The sines and cosines of the angles.
+    """
+    if trig == _TRIG_POLY:
+        return _fast_sincos(x)
+    if trig == _TRIG_LUT:
+        k = np.floor(x * _LUT_SCALE + 0.5).astype(np.int64)
+        return _LUT_SIN[k & _LUT_MASK], _LUT_SIN[(k + _LUT_QUARTER) & _LUT_MASK]
+    return np.sin(x), np.cos(x)
+
+
+def _add_component_inplace(arg, s, c, amp_sin, amp_cos, trig, out) -> None:
+    """
+    Adds amp_sin * sin(x) + amp_cos * cos(3x) to out without allocating for the exact mode.
+
+    The cosine of the triple angle is given by the identity cos(3x) = 4cos(x)^3 - 3cos(x).
+
+    Args:
+        arg (np.ndarray): The angles x in radians, overwritten.
+        s (np.ndarray): Array of the shape of arg for the sines, overwritten.
+        c (np.ndarray): Array of the shape of arg for the cosines, overwritten.
+        amp_sin (float | np.ndarray): Amplitudes of the sine waves.
+        amp_cos (float | np.ndarray): Amplitudes of the cosine waves.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+        out (np.ndarray): Values the component is added to in place.
+    """
+    if trig == _TRIG_EXACT:
+        np.sin(arg, out=s)
+        np.cos(arg, out=c)
+    else:
+        s[...], c[...] = _sincos_array(arg, trig)
+
+    # (amp_cos * c) * (4c^2 - 3) computed in place in c, in the order of generate_batch
+    np.multiply(c, c, out=arg)
+    arg *= 4
+    arg -= 3
+    c *= amp_cos
+    c *= arg
+    s *= amp_sin
+    s += c
+    out += s
+
+
+@njit(cache=True, fastmath=True)
+def _sinusoidal_component(t, omega, amp_sin, amp_cos, trig):
+    """
+    Calculates one component of the sinusoidal pattern, two sinusoidal waves added together.
+
+    Both waves are derived from the sine and cosine of the same angle, the cosine of the
+    triple angle is given by the identity cos(3x) = 4cos(x)^3 - 3cos(x).
+
+    Args:
+        t (float): Time in hours.
+        omega (float): Angular frequency of the component in radians per hour.
+        amp_sin (float): Amplitude of the sine wave, the amplitude times the sine ratio.
+        amp_cos (float): Amplitude of the cosine wave, the amplitude times the cosine ratio.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+
+    Returns:
+        float: The value of the component at time t.
+    """
+    s, c = _sincos(omega * t, trig)
+    return amp_sin * s + amp_cos * c * (4 * c * c - 3)
+
+
+@njit(cache=True, fastmath=True)
+def _sinusoidal_step(t, so, ss, sc, wo, ws, wc, trig):
+    """
+    Calculates the deterministic part of the sinusoidal pattern, the seasonal and weekly
+    components added together, without noise and offset.
+
+    Args:
+        t (float): Time in hours.
+        so, ss, sc (float): Angular frequency, sine amplitude and cosine amplitude of the seasonal component.
+        wo, ws, wc (float): Angular frequency, sine amplitude and cosine amplitude of the weekly component.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+
+    Returns:
+        float: The value of the pattern at time t.
+    """
+    return _sinusoidal_component(t, so, ss, sc, trig) + _sinusoidal_component(
+        t, wo, ws, wc, trig
+    )
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _sinusoidal_batch_par(t0, delta, so, ss, sc, wo, ws, wc, trig, noise, noise_std, offset, out):
+    """
+    Calculates the next values of the sinusoidal pattern, the steps are split between threads.
+
+    The time of step i is t0 + (i + 1) * delta, so every step can be computed on its own.
+    The noise is drawn beforehand as the random generator can not be shared by the threads.
+    The "poly" mode has its own loop with the polynomials and no branches in its body,
+    which LLVM vectorizes.
+
+    Args:
+        t0 (float): Time of the last generated value in hours.
+        delta (float): Time between consecutive values.
+        so, ss, sc (float): Angular frequency, sine amplitude and cosine amplitude of the seasonal component.
+        wo, ws, wc (float): Angular frequency, sine amplitude and cosine amplitude of the weekly component.
+        trig (int): Index of the trig mode in `_TRIG_MODES`.
+        noise (np.ndarray): Standard normal samples, one per value.
+        noise_std (float): Standard deviation of the noise.
+        offset (float): Offset added to the values.
+        out (np.ndarray): Array the values are written to, its length is the number of steps.
+
+    Returns:
+        np.ndarray: The out array.
+    """
+    if trig == _TRIG_POLY:
+        for i in prange(len(out)):
+            t = t0 + (i + 1) * delta
+            s_s, c_s = _fast_sincos(so * t)
+            s_w, c_w = _fast_sincos(wo * t)
+            wave = (
+                ss * s_s
+                + sc * c_s * (4 * c_s * c_s - 3)
+                + ws * s_w
+                + wc * c_w * (4 * c_w * c_w - 3)
+            )
+            out[i] = wave + noise_std * noise[i] + offset
+    else:
+        for i in prange(len(out)):
+            wave = _sinusoidal_step(t0 + (i + 1) * delta, so, ss, sc, wo, ws, wc, trig)
+            out[i] = wave + noise_std * noise[i] + offset
+    return out
+
 
 class SinusoidalPatternGenerator(StreamGenerator):
     """
@@ -42,6 +425,8 @@ class SinusoidalPatternGenerator(StreamGenerator):
         weekly_cos_ratio: float = 0.3,
         noise_std: float = 0.04,
         offset: float = 2.0,
+        seed: int | None = None,
+        trig_mode: str = "exact",
     ) -> None:
         """
         Initializes the simulation class with parameters for seasonal and weekly
@@ -58,9 +443,18 @@ class SinusoidalPatternGenerator(StreamGenerator):
             weekly_cos_ratio (float): Cosine ratio for the weekly component (default: 0.3).
             noise_std (float): Standard deviation of the noise added to the signal (default: 0.04).
             offset (float): Offset added to the final signal (default: 2.0).
+            seed (int | None): Seed of the noise random generator, None for a random seed (default: None).
+            trig_mode (str): How the sines and cosines are evaluated, "exact" uses the math library,
+                "poly" uses polynomial approximations accurate to about 1e-7 and "lut" reads them
+                from a table with an error below 1e-3. The approximations only speed up
+                `generate_batch` compiled with Numba, `generate_next` is fastest with "exact"
+                (default: "exact").
         """
         super().__init__()
 
+        if trig_mode not in _TRIG_MODES:
+            raise ValueError("Invalid trig mode")
+
         self.seasonal_freq = seasonal_freq
         self.seasonal_amp = seasonal_amp
         self.seasonal_sin_ratio = seasonal_sin_ratio
@@ -73,6 +467,37 @@ class SinusoidalPatternGenerator(StreamGenerator):
 
         self.noise_std = noise_std
         self.offset = offset
+        self.trig_mode = trig_mode
+
+        # Angular frequencies and wave amplitudes are fixed, so they are computed once
+        self._omega_s = 2 * math.pi * seasonal_freq
+        self._amp_s_sin = seasonal_amp * seasonal_sin_ratio
+        self._amp_s_cos = seasonal_amp * seasonal_cos_ratio
+        self._omega_w = 2 * math.pi * weekly_freq
+        self._amp_w_sin = weekly_amp * weekly_sin_ratio
+        self._amp_w_cos = weekly_amp * weekly_cos_ratio
+        self._trig_code = _TRIG_MODES.index(trig_mode)
+        self._scalar_sincos = (
+            _sincos if NUMBA_AVAILABLE and self._trig_code == _TRIG_POLY else _sincos_scalar
+        )
+
+        # Sines and cosines of both components at time _trig_t, advanced by rotating them
+        # with the sines and cosines of the angle steps while delta stays the same
+        self._trig_t: float | None = None
+        self._trig = (0.0, 1.0, 0.0, 1.0)
+        self._last_delta: float | None = None
+        self._step_trig = (0.0, 1.0, 0.0, 1.0)
+        self._steps_to_resync = 0
+
+        # Standard normal samples are drawn in chunks and handed out one by one
+        self._rng = np.random.default_rng(seed)
+        self._noise_buf: list[float] = []
+        self._noise_idx = 0
+
+        # Scratch arrays of generate_batch_into, grown to the largest batch seen
+        self._batch_steps = np.empty(0)
+        self._batch_scratch = np.empty((4, 0))
+        self._batch_noise = np.empty(0)
 
         self.t = 0.0
 
@@ -80,20 +505,196 @@ class SinusoidalPatternGenerator(StreamGenerator):
         """
         Generates the next value in the simulation.
 
+        In the "exact" trig mode, when called repeatedly with the same delta, the sines and
+        cosines of the previous step are rotated by the constant angle step with the angle
+        addition formulas instead of being evaluated again. They are recomputed every
+        `_RESYNC_STEPS` steps to bound the accumulated rounding error. The "poly" and "lut"
+        modes evaluate them every step, like `generate_batch`.
+
         Args:
             delta (float): Time since the last generated value.
 
         Returns:
             float: The next value in the simulation.
         """
-        self.t += delta
-        wave = (
-            self._get_seasonal_delta() + self._get_weekly_delta()
-        )  # add seasonal and weekly components
-        wave += self._generate_noise()  # add noise
+        t = self.t
+        if (
+            delta == self._last_delta
+            and t == self._trig_t
+            and self._steps_to_resync
+            and self._trig_code == _TRIG_EXACT
+        ):
+            self._steps_to_resync -= 1
+            sin_s, cos_s, sin_w, cos_w = self._trig
+            sin_ds, cos_ds, sin_dw, cos_dw = self._step_trig
+            sin_s, cos_s = sin_s * cos_ds + cos_s * sin_ds, cos_s * cos_ds - sin_s * sin_ds
+            sin_w, cos_w = sin_w * cos_dw + cos_w * sin_dw, cos_w * cos_dw - sin_w * sin_dw
+            self.t = t = t + delta
+        else:
+            if delta != self._last_delta:
+                self._last_delta = delta
+                omega_s, omega_w = self._omega_s, self._omega_w
+                self._step_trig = (
+                    _sin(omega_s * delta),
+                    _cos(omega_s * delta),
+                    _sin(omega_w * delta),
+                    _cos(omega_w * delta),
+                )
+            self._steps_to_resync = _RESYNC_STEPS
+            self.t = t = t + delta
+            sincos = self._scalar_sincos
+            sin_s, cos_s = sincos(self._omega_s * t, self._trig_code)
+            sin_w, cos_w = sincos(self._omega_w * t, self._trig_code)
+        self._trig = (sin_s, cos_s, sin_w, cos_w)
+        self._trig_t = t
+
+        wave = self._amp_s_sin * sin_s + self._amp_s_cos * cos_s * (
+            4 * cos_s * cos_s - 3
+        )  # add seasonal component
+        wave += self._amp_w_sin * sin_w + self._amp_w_cos * cos_w * (
+            4 * cos_w * cos_w - 3
+        )  # add weekly component
+
+        # add noise, same as _generate_noise without the method call
+        noise_buf = self._noise_buf
+        noise_idx = self._noise_idx
+        if noise_idx >= len(noise_buf):
+            self._noise_buf = noise_buf = self._rng.standard_normal(_NOISE_BUFFER_SIZE).tolist()
+            noise_idx = 0
+        self._noise_idx = noise_idx + 1
+        wave += noise_buf[noise_idx] * self.noise_std
+
         wave += self.offset  # add offset
         return wave
 
+    def generate_batch(self, n: int, delta: float, dtype=np.float64) -> np.ndarray:
+        """
+        Generates the next n values in the simulation at once.
+
+        With Numba the values are computed by the compiled parallel kernel, otherwise with
+        NumPy on the array of the n sample times. With float32 the noise is drawn in float32
+        in both cases. The compiled kernel does the rest of the math in float64 and only
+        stores the results as float32, while the NumPy path keeps the times in float64 and
+        computes the reduced angles and the trigonometric functions in float32.
+
+        Args:
+            n (int): Number of values to generate.
+            delta (float): Time between consecutive values.
+            dtype (np.dtype): Data type of the returned values, float32 or float64 (default: np.float64).
+
+        Returns:
+            np.ndarray: The next n values in the simulation.
+        """
+        dtype = _float_dtype(dtype)
+        if NUMBA_AVAILABLE:
+            # Compiled kernel spread over all cores, the times are computed in the kernel
+            t0 = self.t
+            self.t = t0 + delta * n
+            return _sinusoidal_batch_par(
+                t0,
+                delta,
+                *self._wave_params(),
+                self._rng.standard_normal(n, dtype=dtype),
+                self.noise_std,
+                self.offset,
+                np.empty(n, dtype=dtype),
+            )
+
+        ts = self.t + delta * np.arange(1, n + 1, dtype=np.float64)
+        if n > 0:
+            self.t = float(ts[-1])
+
+        # Each angle is computed once and shared by the sine and the cosine, the
+        # triple angle cosine is derived from the cosine with 4cos(x)^3 - 3cos(x)
+        seasonal_arg = _reduced_angle(self._omega_s * ts, dtype)
+        weekly_arg = _reduced_angle(self._omega_w * ts, dtype)
+        seasonal_sin, seasonal_cos = _sincos_array(seasonal_arg, self._trig_code)
+        weekly_sin, weekly_cos = _sincos_array(weekly_arg, self._trig_code)
+
+        wave = self._amp_s_sin * seasonal_sin + self._amp_s_cos * seasonal_cos * (
+            4 * seasonal_cos * seasonal_cos - 3
+        )  # add seasonal component
+        wave += self._amp_w_sin * weekly_sin + self._amp_w_cos * weekly_cos * (
+            4 * weekly_cos * weekly_cos - 3
+        )  # add weekly component
+        wave += self.noise_std * self._rng.standard_normal(n, dtype=dtype)  # add noise
+        wave += self.offset  # add offset
+        return wave.astype(dtype, copy=False)
+
+    def generate_batch_into(self, out: np.ndarray, delta: float) -> np.ndarray:
+        """
+        Generates the next len(out) values in the simulation into an existing array.
+
+        Gives the same values as `generate_batch` for float64, but the intermediate arrays
+        are kept on the generator and reused by the next calls, so repeated batches of the
+        same size allocate no memory.
+
+        Args:
+            out (np.ndarray): One dimensional float32 or float64 array the values are written to.
+            delta (float): Time between consecutive values.
+
+        Returns:
+            np.ndarray: The out array.
+        """
+        _float_dtype(out.dtype)
+        if out.ndim != 1:
+            raise ValueError("Output array must be one dimensional")
+        n = len(out)
+        if NUMBA_AVAILABLE:
+            # Compiled kernel spread over all cores, only the noise needs an array
+            if n > len(self._batch_noise):
+                self._batch_noise = np.empty(n)
+            t0 = self.t
+            self.t = t0 + delta * n
+            noise = self._rng.standard_normal(out=self._batch_noise[:n])
+            return _sinusoidal_batch_par(
+                t0, delta, *self._wave_params(), noise, self.noise_std, self.offset, out
+            )
+
+        if n > len(self._batch_steps):
+            self._batch_steps = np.arange(1, n + 1, dtype=np.float64)
+            self._batch_scratch = np.empty((4, n))
+        ts, arg, s, c = self._batch_scratch[:, :n]
+
+        np.multiply(self._batch_steps[:n], delta, out=ts)
+        ts += self.t
+        if n > 0:
+            self.t = float(ts[-1])
+
+        out[...] = 0.0
+        for omega, amp_sin, amp_cos in (
+            (self._omega_s, self._amp_s_sin, self._amp_s_cos),
+            (self._omega_w, self._amp_w_sin, self._amp_w_cos),
+        ):
+            np.multiply(ts, omega, out=arg)
+            _add_component_inplace(arg, s, c, amp_sin, amp_cos, self._trig_code, out)
+
+        # add noise and offset
+        self._rng.standard_normal(out=s)
+        s *= self.noise_std
+        out += s
+        out += self.offset
+        return out
+
+    def _wave_params(self) -> tuple:
+        """
+        Returns the parameters of the seasonal and weekly components in the order
+        expected by the compiled kernels.
+
+        Returns:
+            tuple: The angular frequency, sine amplitude and cosine amplitude of the seasonal
+            component followed by those of the weekly component, and the index of the trig mode.
+        """
+        return (
+            self._omega_s,
+            self._amp_s_sin,
+            self._amp_s_cos,
+            self._omega_w,
+            self._amp_w_sin,
+            self._amp_w_cos,
+            self._trig_code,
+        )
+
     def _get_seasonal_delta(self) -> float:
         """
         Calculates the seasonal component of the signal using two sinousoidal waves added together.
@@ -101,10 +702,8 @@ class SinusoidalPatternGenerator(StreamGenerator):
         Returns:
             float: The calculated seasonal component.
         """
-        return self.seasonal_amp * self.seasonal_sin_ratio * math.sin(
-            2 * math.pi * self.t * self.seasonal_freq
-        ) + self.seasonal_amp * self.seasonal_cos_ratio * math.cos(
-            3 * 2 * math.pi * self.t * self.seasonal_freq
+        return _sinusoidal_component(
+            self.t, self._omega_s, self._amp_s_sin, self._amp_s_cos, self._trig_code
         )
 
     def _get_weekly_delta(self) -> float:
@@ -114,17 +713,302 @@ class SinusoidalPatternGenerator(StreamGenerator):
         Returns:
             float: The calculated weekly component.
         """
-        return self.weekly_amp * self.weekly_sin_ratio * math.sin(
-            2 * math.pi * self.t * self.weekly_freq
-        ) + self.weekly_amp * self.weekly_cos_ratio * math.cos(
-            3 * 2 * math.pi * self.t * self.weekly_freq
+        return _sinusoidal_component(
+            self.t, self._omega_w, self._amp_w_sin, self._amp_w_cos, self._trig_code
         )
 
     def _generate_noise(self):
         """
         Generates a random noise value from a normal distribution with a standard deviation of self.noise_std and a mean of 0.
 
+        The samples come from a buffer of standard normal samples that is refilled
+        from the NumPy random generator once it is used up.
+
         Returns:
             float: The generated noise value.
         """
-        return random.normalvariate(0, self.noise_std)
+        if self._noise_idx >= len(self._noise_buf):
+            self._noise_buf = self._rng.standard_normal(_NOISE_BUFFER_SIZE).tolist()
+            self._noise_idx = 0
+        noise = self._noise_buf[self._noise_idx]
+        self._noise_idx += 1
+        return noise * self.noise_std
+
+
+class MultiSinusoidalPatternGenerator(StreamGenerator):
+    """
+    Generates several independent sinusoidal patterns at once, one per simulated sensor.
+
+    The parameters of the streams are held as arrays with one entry per stream, so each
+    step evaluates all the streams with a single set of NumPy operations.
+    """
+
+    def __init__(
+        self,
+        n_streams: int,
+        seasonal_freq: float | np.ndarray = 1 / (6 * 30 * 24),
+        seasonal_amp: float | np.ndarray = 1.0,
+        seasonal_sin_ratio: float | np.ndarray = 1.0,
+        seasonal_cos_ratio: float | np.ndarray = 0.5,
+        weekly_freq: float | np.ndarray = 1 / (20 * 24),
+        weekly_amp: float | np.ndarray = 0.5,
+        weekly_sin_ratio: float | np.ndarray = 1.0,
+        weekly_cos_ratio: float | np.ndarray = 0.3,
+        noise_std: float | np.ndarray = 0.04,
+        offset: float | np.ndarray = 2.0,
+        seed: int | None = None,
+        trig_mode: str = "exact",
+    ) -> None:
+        """
+        Initializes the generator with the parameters of every stream. Each parameter is
+        either a single value shared by all the streams or an array with one value per stream.
+
+        Args:
+            n_streams (int): Number of streams to generate.
+            seasonal_freq (float | np.ndarray): Frequency of the seasonal component in cycles per hour (default: 1/(6 * 30 * 24)).
+            seasonal_amp (float | np.ndarray): Amplitude of the seasonal component (default: 1.0).
+            seasonal_sin_ratio (float | np.ndarray): Sine ratio for the seasonal component (default: 1.0).
+            seasonal_cos_ratio (float | np.ndarray): Cosine ratio for the seasonal component (default: 0.5).
+            weekly_freq (float | np.ndarray): Frequency of the weekly component in cycles per hour (default: 1/(20 * 24)).
+            weekly_amp (float | np.ndarray): Amplitude of the weekly component (default: 0.5).
+            weekly_sin_ratio (float | np.ndarray): Sine ratio for the weekly component (default: 1.0).
+            weekly_cos_ratio (float | np.ndarray): Cosine ratio for the weekly component (default: 0.3).
+            noise_std (float | np.ndarray): Standard deviation of the noise added to the signals (default: 0.04).
+            offset (float | np.ndarray): Offset added to the final signals (default: 2.0).
+            seed (int | None): Seed of the noise random generator, None for a random seed (default: None).
+            trig_mode (str): How the sines and cosines are evaluated, "exact" uses NumPy, "poly"
+                uses polynomial approximations accurate to about 1e-7 and "lut" reads them from a
+                table with an error below 1e-3 (default: "exact").
+        """
+        super().__init__()
+
+        if n_streams <= 0:
+            raise ValueError("Number of streams must be positive")
+        if trig_mode not in _TRIG_MODES:
+            raise ValueError("Invalid trig mode")
+
+        def per_stream(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (n_streams,)).copy()
+
+        self.n_streams = n_streams
+        self.seasonal_freq = per_stream(seasonal_freq)
+        self.seasonal_amp = per_stream(seasonal_amp)
+        self.seasonal_sin_ratio = per_stream(seasonal_sin_ratio)
+        self.seasonal_cos_ratio = per_stream(seasonal_cos_ratio)
+
+        self.weekly_freq = per_stream(weekly_freq)
+        self.weekly_amp = per_stream(weekly_amp)
+        self.weekly_sin_ratio = per_stream(weekly_sin_ratio)
+        self.weekly_cos_ratio = per_stream(weekly_cos_ratio)
+
+        self.noise_std = per_stream(noise_std)
+        self.offset = per_stream(offset)
+        self.trig_mode = trig_mode
+
+        # Angular frequencies and wave amplitudes are fixed, so they are computed once
+        self._omega_s = 2 * np.pi * self.seasonal_freq
+        self._amp_s_sin = self.seasonal_amp * self.seasonal_sin_ratio
+        self._amp_s_cos = self.seasonal_amp * self.seasonal_cos_ratio
+        self._omega_w = 2 * np.pi * self.weekly_freq
+        self._amp_w_sin = self.weekly_amp * self.weekly_sin_ratio
+        self._amp_w_cos = self.weekly_amp * self.weekly_cos_ratio
+        self._trig_code = _TRIG_MODES.index(trig_mode)
+
+        self._rng = np.random.default_rng(seed)
+        self._seed = seed
+        self._gpu_rng = None
+
+        # Scratch arrays reused by every call of generate_next
+        self._arg = np.empty(n_streams)
+        self._sin = np.empty(n_streams)
+        self._cos = np.empty(n_streams)
+        self._wave = np.empty(n_streams)
+
+        # Scratch arrays of generate_batch_into, grown to the largest batch seen
+        self._batch_steps = np.empty((0, 1))
+        self._batch_ts = np.empty((0, 1))
+        self._batch_scratch = np.empty((4, 0, n_streams))
+
+        self.t = 0.0
+
+    def generate_next(self, delta: float) -> np.ndarray:
+        """
+        Generates the next value of every stream.
+
+        Args:
+            delta (float): Time since the last generated values.
+
+        Returns:
+            np.ndarray: The next values, one per stream.
+        """
+        self.t += delta
+        wave = self._wave
+        wave.fill(0.0)
+        scratch = (self._arg, self._sin, self._cos)
+        self._add_component(
+            self.t, self._omega_s, self._amp_s_sin, self._amp_s_cos, wave, scratch
+        )
+        self._add_component(
+            self.t, self._omega_w, self._amp_w_sin, self._amp_w_cos, wave, scratch
+        )
+
+        # add noise and offset
+        noise = self._rng.standard_normal(self.n_streams)
+        noise *= self.noise_std
+        noise += self.offset
+        noise += wave
+        return noise
+
+    def generate_batch(self, n: int, delta: float, dtype=np.float64) -> np.ndarray:
+        """
+        Generates the next n values of every stream at once.
+
+        Args:
+            n (int): Number of values to generate per stream.
+            delta (float): Time between consecutive values.
+            dtype (np.dtype): Data type of the returned values, float32 or float64 (default: np.float64).
+
+        Returns:
+            np.ndarray: The next values with shape (n, n_streams), row i holds the values
+            of all the streams at the i-th time.
+        """
+        dtype = _float_dtype(dtype)
+        ts = self.t + delta * np.arange(1, n + 1, dtype=np.float64)
+        if n > 0:
+            self.t = float(ts[-1])
+        ts = ts[:, np.newaxis]
+
+        wave = np.zeros((n, self.n_streams), dtype=dtype)
+        self._add_component(ts, self._omega_s, self._amp_s_sin, self._amp_s_cos, wave)
+        self._add_component(ts, self._omega_w, self._amp_w_sin, self._amp_w_cos, wave)
+
+        # add noise and offset
+        noise = self._rng.standard_normal((n, self.n_streams), dtype=dtype)
+        noise *= self.noise_std.astype(dtype, copy=False)
+        wave += noise
+        wave += self.offset.astype(dtype, copy=False)
+        return wave
+
+    def generate_batch_into(self, out: np.ndarray, delta: float) -> np.ndarray:
+        """
+        Generates the next len(out) values of every stream into an existing array.
+
+        Gives the same values as `generate_batch` for float64, but the intermediate arrays
+        are kept on the generator and reused by the next calls, so repeated batches of the
+        same size allocate no memory.
+
+        Args:
+            out (np.ndarray): Float32 or float64 array of shape (n, n_streams) the values are written to.
+            delta (float): Time between consecutive values.
+
+        Returns:
+            np.ndarray: The out array.
+        """
+        _float_dtype(out.dtype)
+        if out.ndim != 2 or out.shape[1] != self.n_streams:
+            raise ValueError("Output array must have shape (n, n_streams)")
+        n = len(out)
+        if n > len(self._batch_steps):
+            self._batch_steps = np.arange(1, n + 1, dtype=np.float64)[:, np.newaxis]
+            self._batch_ts = np.empty((n, 1))
+            self._batch_scratch = np.empty((4, n, self.n_streams))
+        ts = self._batch_ts[:n]
+        arg, s, c, noise = self._batch_scratch[:, :n]
+
+        np.multiply(self._batch_steps[:n], delta, out=ts)
+        ts += self.t
+        if n > 0:
+            self.t = float(ts[-1, 0])
+
+        out[...] = 0.0
+        scratch = (arg, s, c)
+        self._add_component(ts, self._omega_s, self._amp_s_sin, self._amp_s_cos, out, scratch)
+        self._add_component(ts, self._omega_w, self._amp_w_sin, self._amp_w_cos, out, scratch)
+
+        # add noise and offset
+        self._rng.standard_normal(out=noise)
+        noise *= self.noise_std
+        out += noise
+        out += self.offset
+        return out
+
+    def generate_batch_gpu(self, n: int, delta: float, dtype=np.float64):
+        """
+        Generates the next n values of every stream at once on a CUDA device with CuPy.
+
+        Uses the same arithmetic as `generate_batch` with exact trigonometric functions and
+        its own device random generator, so its noise differs from the CPU one. The device is
+        given by the ANOMALY_GPU_DEVICE environment variable (default: 0). Kernel launches
+        only pay off for large batches, in the order of a million values, smaller batches
+        should stay on `generate_batch`.
+
+        Args:
+            n (int): Number of values to generate per stream.
+            delta (float): Time between consecutive values.
+            dtype (np.dtype): Data type of the returned values, float32 or float64 (default: np.float64).
+
+        Returns:
+            cupy.ndarray: The next values with shape (n, n_streams) left on the device, call
+            `.get()` to copy them to the host.
+
+        Raises:
+            ImportError: If CuPy is not installed.
+        """
+        if cp is None:
+            raise ImportError("CuPy is required to generate batches on the GPU")
+        dtype = _float_dtype(dtype)
+
+        with cp.cuda.Device(int(os.environ.get(_GPU_DEVICE_ENV, "0"))):
+            if self._gpu_rng is None:
+                self._gpu_rng = cp.random.default_rng(self._seed)
+
+            ts = self.t + delta * cp.arange(1, n + 1, dtype=cp.float64)
+            if n > 0:
+                # Same value as the last time without reading it back from the device
+                self.t = self.t + delta * n
+            ts = ts[:, cp.newaxis]
+
+            wave = cp.zeros((n, self.n_streams), dtype=dtype)
+            for omega, amp_sin, amp_cos in (
+                (self._omega_s, self._amp_s_sin, self._amp_s_cos),
+                (self._omega_w, self._amp_w_sin, self._amp_w_cos),
+            ):
+                arg = cp.asarray(omega) * ts
+                if dtype != np.float64:
+                    arg = cp.remainder(arg, 2 * np.pi).astype(dtype)
+                c = cp.cos(arg)
+                wave += cp.asarray(amp_sin, dtype=dtype) * cp.sin(arg)
+                wave += cp.asarray(amp_cos, dtype=dtype) * c * (4 * c * c - 3)
+
+            # add noise and offset
+            wave += cp.asarray(self.noise_std, dtype=dtype) * self._gpu_rng.standard_normal(
+                (n, self.n_streams), dtype=dtype
+            )
+            wave += cp.asarray(self.offset, dtype=dtype)
+        return wave
+
+    def _add_component(self, t, omega, amp_sin, amp_cos, out: np.ndarray, scratch=None) -> None:
+        """
+        Adds one component of the pattern, two sinusoidal waves, to the values of the streams.
+
+        Without scratch arrays the angles are computed in the data type of out.
+
+        Args:
+            t (float | np.ndarray): Time in hours, a column of times for a batch.
+            omega (np.ndarray): Angular frequencies of the component in radians per hour.
+            amp_sin (np.ndarray): Amplitudes of the sine waves.
+            amp_cos (np.ndarray): Amplitudes of the cosine waves.
+            out (np.ndarray): Values of the streams, updated in place.
+            scratch (tuple[np.ndarray, np.ndarray, np.ndarray] | None): Float64 arrays of the
+                shape of out for the angles, sines and cosines, None to allocate them (default: None).
+        """
+        if scratch is not None:
+            arg, s, c = scratch
+            np.multiply(omega, t, out=arg)
+        else:
+            arg = _reduced_angle(omega * t, out.dtype)
+            s, c = np.empty_like(arg), np.empty_like(arg)
+            amp_sin = amp_sin.astype(out.dtype, copy=False)
+            amp_cos = amp_cos.astype(out.dtype, copy=False)
+
+        _add_component_inplace(arg, s, c, amp_sin, amp_cos, self._trig_code, out)